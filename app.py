@@ -2,12 +2,21 @@
 
 
 import streamlit as st
+import pandas as pd
 from uuid import uuid4
 import json
 import os
 from datetime import date, datetime, timedelta
 from typing import List, Dict, Any
 import random
+import shutil
+import threading
+from contextlib import contextmanager
+
+try:
+    import orjson
+except ImportError:  # optional speedup, fall back to stdlib json
+    orjson = None
 
 # -----------------------
 # Constants & Utilities
@@ -26,29 +35,155 @@ DEFAULT_QUOTES = [
 # -----------------------
 # Data model helpers
 # -----------------------
-def init_data_file():
+def init_data_file(path: str = DATA_FILE):
     """Create initial JSON structure if file doesn't exist."""
-    if not os.path.exists(DATA_FILE):
+    if not os.path.exists(path):
         initial = {"tasks": [], "habits": []}
-        save_data(initial)
+        save_data(initial, path)
 
-def load_data() -> Dict[str, Any]:
+def load_data(path: str = DATA_FILE) -> Dict[str, Any]:
     """Load data from JSON file. Return dict with 'tasks' and 'habits'."""
-    init_data_file()
-    with open(DATA_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
+    init_data_file(path)
+    with open(path, "rb") as f:
+        data = _loads(f.read())
+    for t in data.get("tasks", []):
+        _parse_task_dates(t)
+    # Habit logs are sets of date ordinals in memory: int hashing, no isoformat per lookup
+    for h in data.get("habits", []):
+        _parse_habit_log(h)
+    return data
+
+def _parse_iso(iso_str: str):
+    try:
+        return datetime.fromisoformat(iso_str) if iso_str else None
+    except (TypeError, ValueError):
+        return None
+
+def _parse_task_dates(task: Dict[str, Any]):
+    """Cache parsed deadline/created_at on the task under underscore keys (never saved)."""
+    for key, field in (("_deadline_dt", "deadline"), ("_created_dt", "created_at")):
+        dt = _parse_iso(task.get(field))
+        # Drop any UTC offset so sort keys never mix naive and aware datetimes
+        task[key] = dt.replace(tzinfo=None) if dt else None
+
+def _parse_habit_log(habit: Dict[str, Any]):
+    """Move the saved ISO 'log' into '_log_ord'; unparseable entries are kept verbatim in '_log_raw'."""
+    habit["_log_ord"], habit["_log_raw"] = set(), []
+    for entry in habit.pop("log", None) or []:
+        dt = _parse_iso(entry)
+        if dt is None:
+            habit["_log_raw"].append(entry)
+        else:
+            habit["_log_ord"].add(dt.toordinal())
+
+def _to_serializable(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Strip in-memory-only underscore fields and turn habit logs back into ISO date lists."""
+    tasks = [{k: v for k, v in t.items() if not k.startswith("_")} for t in data.get("tasks", [])]
+    habits = [
+        {**{k: v for k, v in h.items() if not k.startswith("_")},
+         "log": [date.fromordinal(o).isoformat() for o in sorted(h["_log_ord"])] + h.get("_log_raw", [])}
+        for h in data.get("habits", [])
+    ]
+    return {**data, "tasks": tasks, "habits": habits}
+
+def _loads(raw: bytes) -> Dict[str, Any]:
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+def _dumps(data: Dict[str, Any]) -> bytes:
+    """Serialize data to UTF-8 JSON bytes, using orjson when it is installed."""
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2, default=str)
+    return json.dumps(data, ensure_ascii=False, indent=2, default=str).encode("utf-8")
+
+def save_data(data: Dict[str, Any], path: str = DATA_FILE):
+    """Save dictionary to JSON file atomically (temp file + rename)."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_dumps(_to_serializable(data)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+# -----------------------
+# Shared data store
+# -----------------------
+class DataStore:
+    """Parsed data file plus id indexes, shared by every session in the process.
+
+    Mutations happen inside ``mutate()``, which marks the store dirty;
+    ``flush()`` at the end of a script run writes the file once.
+    """
 
-def save_data(data: Dict[str, Any]):
-    """Save dictionary to JSON file."""
-    with open(DATA_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2, default=str)
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.RLock()
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        """(Re)read the data file and rebuild the indexes."""
+        self.set(load_data(self.path))
+        self.mtime = os.path.getmtime(self.path)
+
+    def set(self, data: Dict[str, Any]):
+        """Install data as the store contents and rebuild the id indexes."""
+        self.data = data
+        self.tasks: List[Dict[str, Any]] = data.setdefault("tasks", [])
+        self.habits: List[Dict[str, Any]] = data.setdefault("habits", [])
+        self.task_by_id = {t["id"]: t for t in self.tasks}
+        self.habit_by_id = {h["id"]: h for h in self.habits}
+        # Kept up to date by the task mutators so the dashboard never rescans tasks
+        self.completed_count = sum(1 for t in self.tasks if t.get("completed"))
+        self._by_status = None
+
+    @property
+    def by_status(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Tasks partitioned by the sidebar status filter; rebuilt lazily after a mutation."""
+        # Read once into a local: another session's mutate() may reset the attribute meanwhile
+        by_status = self._by_status
+        if by_status is None:
+            pending, completed = [], []
+            for t in self.tasks:
+                (completed if t.get("completed") else pending).append(t)
+            by_status = {"All": self.tasks, "Pending": pending, "Completed": completed}
+            self._by_status = by_status
+        return by_status
+
+    def refresh(self):
+        """Reload if the file was changed outside the app and nothing is pending."""
+        with self.lock:
+            if not self.dirty and os.path.exists(self.path) and os.path.getmtime(self.path) != self.mtime:
+                self.load()
+
+    @contextmanager
+    def mutate(self):
+        with self.lock:
+            yield self
+            self.dirty = True
+            self._by_status = None
+
+    def save(self):
+        with self.lock:
+            save_data(self.data, self.path)
+            self.mtime = os.path.getmtime(self.path)
+            self.dirty = False
+
+    def flush(self):
+        """Persist the data if anything changed since the last save."""
+        if self.dirty:
+            self.save()
+
+@st.cache_resource(show_spinner=False)
+def get_store() -> DataStore:
+    # cache_resource (not cache_data): one mutable instance shared across sessions
+    return DataStore(DATA_FILE)
 
 # -----------------------
 # Task-related functions
 # -----------------------
 def create_task(title: str, description: str, deadline: date) -> Dict[str, Any]:
     """Create a task object."""
-    return {
+    task = {
         "id": str(uuid4()),
         "title": title.strip(),
         "description": description.strip(),
@@ -56,67 +191,81 @@ def create_task(title: str, description: str, deadline: date) -> Dict[str, Any]:
         "created_at": datetime.now().isoformat(),
         "completed": False
     }
+    _parse_task_dates(task)
+    return task
 
 def add_task(task: Dict[str, Any]):
-    data = load_data()
-    data["tasks"].append(task)
-    save_data(data)
+    with get_store().mutate() as store:
+        store.tasks.append(task)
+        store.task_by_id[task["id"]] = task
+        store.completed_count += bool(task.get("completed"))
 
 def update_task(task_id: str, **changes):
-    data = load_data()
-    for t in data["tasks"]:
-        if t["id"] == task_id:
-            t.update(changes)
-            break
-    save_data(data)
+    store = get_store()
+    t = store.task_by_id.get(task_id)
+    if t is None:
+        return
+    with store.mutate():
+        was_completed = bool(t.get("completed"))
+        t.update(changes)
+        store.completed_count += bool(t.get("completed")) - was_completed
+        if "deadline" in changes or "created_at" in changes:
+            _parse_task_dates(t)
 
 def delete_task(task_id: str):
-    data = load_data()
-    data["tasks"] = [t for t in data["tasks"] if t["id"] != task_id]
-    save_data(data)
+    store = get_store()
+    if task_id not in store.task_by_id:
+        return
+    with store.mutate():
+        store.completed_count -= bool(store.task_by_id.pop(task_id).get("completed"))
+        # Rebuild in place so references to the list held by the UI stay valid
+        store.tasks[:] = store.task_by_id.values()
 
 # -----------------------
 # Habit-related functions
 # -----------------------
 def create_habit(name: str, desc: str) -> Dict[str, Any]:
-    """Create habit object. 'log' stores dates (YYYY-MM-DD) when completed."""
+    """Create habit object. '_log_ord' stores date ordinals of days when completed."""
     return {
         "id": str(uuid4()),
         "name": name.strip(),
         "description": desc.strip(),
         "created_at": datetime.now().isoformat(),
-        "log": []  # list of ISO date strings representing days when habit was done
+        "_log_ord": set()  # saved as 'log', a list of ISO date strings
     }
 
 def add_habit(habit: Dict[str, Any]):
-    data = load_data()
-    data["habits"].append(habit)
-    save_data(data)
+    with get_store().mutate() as store:
+        store.habits.append(habit)
+        store.habit_by_id[habit["id"]] = habit
 
 def update_habit(habit_id: str, **changes):
-    data = load_data()
-    for h in data["habits"]:
-        if h["id"] == habit_id:
-            h.update(changes)
-            break
-    save_data(data)
+    store = get_store()
+    h = store.habit_by_id.get(habit_id)
+    if h is None:
+        return
+    with store.mutate():
+        h.update(changes)
 
 def delete_habit(habit_id: str):
-    data = load_data()
-    data["habits"] = [h for h in data["habits"] if h["id"] != habit_id]
-    save_data(data)
-
-def toggle_habit_for_date(habit_id: str, day_iso: str, is_done: bool):
+    store = get_store()
+    if habit_id not in store.habit_by_id:
+        return
+    with store.mutate():
+        del store.habit_by_id[habit_id]
+        store.habits[:] = store.habit_by_id.values()
+
+def toggle_habit_for_date(habit_id: str, day: date, is_done: bool):
     """Mark or unmark a habit for a particular date."""
-    data = load_data()
-    for h in data["habits"]:
-        if h["id"] == habit_id:
-            if is_done and day_iso not in h["log"]:
-                h["log"].append(day_iso)
-            if not is_done and day_iso in h["log"]:
-                h["log"].remove(day_iso)
-            break
-    save_data(data)
+    store = get_store()
+    h = store.habit_by_id.get(habit_id)
+    if h is None:
+        return
+    with store.mutate():
+        if is_done:
+            h["_log_ord"].add(day.toordinal())
+        else:
+            h["_log_ord"].discard(day.toordinal())
 
 # -----------------------
 # Presentation helpers
@@ -133,6 +282,13 @@ def format_date_iso(iso_str: str):
 def percent(part: int, whole: int) -> int:
     return int((part / whole) * 100) if whole else 0
 
+# Sort option -> (key function, reverse); keys use the dates parsed at load time
+TASK_SORTS = {
+    "Deadline (soonest)": (lambda t: t["_deadline_dt"] or datetime.max, False),
+    "Created (newest)": (lambda t: t["_created_dt"] or datetime.min, True),
+    "Title (A-Z)": (lambda t: t.get("title", "").lower(), False),
+}
+
 def get_week_dates(ref_date: date = None) -> List[date]:
     """Return list of 7 dates for the week starting Monday for the reference date."""
     if ref_date is None:
@@ -140,28 +296,87 @@ def get_week_dates(ref_date: date = None) -> List[date]:
     start = ref_date - timedelta(days=(ref_date.weekday()))  # Monday
     return [start + timedelta(days=i) for i in range(7)]
 
-def weekly_completion_for_habit(habit: Dict[str, Any], ref_date: date = None) -> float:
-    week = get_week_dates(ref_date)
-    week_iso = {d.isoformat() for d in week}
-    done = len([d for d in habit.get("log", []) if d in week_iso])
-    return percent(done, 7)
+def iter_upcoming(tasks: List[Dict[str, Any]], today: date, days: int = 7):
+    """Yield tasks whose deadline falls within the next `days` days (inclusive)."""
+    # Compare dates, not datetimes, so offset-aware deadlines can't raise TypeError
+    for t in tasks:
+        dt = t["_deadline_dt"]
+        if dt is not None and 0 <= (dt.date() - today).days <= days:
+            yield t
+
+def dashboard_habit_stats(habits: List[Dict[str, Any]], ref_date: date = None) -> List[int]:
+    """Return the number of days each habit was done in the week of ref_date."""
+    week_ord = {d.toordinal() for d in get_week_dates(ref_date)}
+    return [len(week_ord & h["_log_ord"]) for h in habits]
 
-def current_streak(habit: Dict[str, Any]) -> int:
+def current_streak(habit: Dict[str, Any], today: date = None) -> int:
     """Compute current consecutive day streak up to today for this habit."""
-    log = set(habit.get("log", []))
+    log = habit["_log_ord"]
     streak = 0
-    today = date.today()
-    day = today
-    while day.isoformat() in log:
+    if today is None:
+        today = date.today()
+    day = today.toordinal()
+    while day in log:
         streak += 1
-        day -= timedelta(days=1)
+        day -= 1
     return streak
 
+# -----------------------
+# Widget callbacks
+# -----------------------
+def _start_editing(state_key: str, item_id: str):
+    st.session_state[state_key] = item_id
+
+def _stop_editing(state_key: str):
+    st.session_state.pop(state_key, None)
+
+def _new_quote():
+    st.session_state["quote"] = random.choice(DEFAULT_QUOTES)
+
+def _on_task_toggle(task_id: str, widget_key: str):
+    update_task(task_id, completed=st.session_state[widget_key])
+
+def _on_task_edit_save(task_id: str):
+    update_task(
+        task_id,
+        title=st.session_state[f"edit_title_{task_id}"],
+        description=st.session_state[f"edit_desc_{task_id}"],
+        deadline=st.session_state[f"edit_deadline_{task_id}"].isoformat(),
+        completed=st.session_state[f"edit_completed_{task_id}"],
+    )
+    # Callbacks run before set_page_config, so the message is shown by the tab body
+    st.session_state["flash_task"] = "Task updated."
+    _stop_editing("editing_task")
+
+def _on_habit_edit_save(habit_id: str):
+    update_habit(
+        habit_id,
+        name=st.session_state[f"edit_name_{habit_id}"],
+        description=st.session_state[f"edit_hdesc_{habit_id}"],
+    )
+    st.session_state["flash_habit"] = "Habit updated."
+    _stop_editing("editing_habit")
+
+def _on_habit_grid_submit(widget_key: str, habit_ids: List[str], days: Dict[str, date]):
+    """Apply the submitted week grid's edited cells ({row: {column: value}}) in one pass."""
+    store = get_store()
+    # The store lock is reentrant, so the per-cell toggles share this one mutate()
+    with store.mutate():
+        for row, cells in st.session_state[widget_key]["edited_rows"].items():
+            for col, done in cells.items():
+                toggle_habit_for_date(habit_ids[int(row)], days[col], bool(done))
+
 # -----------------------
 # Streamlit UI / Layout
 # -----------------------
 st.set_page_config(page_title="FocusBoard — ToDo + Habits", layout="wide", page_icon="✅")
 
+# Load data (shared store; picks up edits made to the file outside the app)
+store = get_store()
+store.refresh()
+tasks = store.tasks
+habits = store.habits
+
 # Minimal custom CSS to make UI modern/minimal
 st.markdown(
     """
@@ -188,9 +403,10 @@ with col1:
     st.title("FocusBoard")
     st.write("A minimal productivity dashboard — To-Do + Habit Tracker")
 with col2:
-    quote = random.choice(DEFAULT_QUOTES)
+    # Pick once per session so the quote doesn't change on every rerun
+    quote = st.session_state.setdefault("quote", random.choice(DEFAULT_QUOTES))
     st.markdown(f"**💬 Quote:** {quote}")
-    st.write("")  # spacing
+    st.button("New quote", on_click=_new_quote)
 
 # Sidebar - navigation and filters
 st.sidebar.header("Navigation")
@@ -226,21 +442,17 @@ with st.sidebar.form("quick_add"):
             else:
                 st.sidebar.error("Habit needs a name.")
 
-# Load data
-data = load_data()
-tasks: List[Dict[str, Any]] = data.get("tasks", [])
-habits: List[Dict[str, Any]] = data.get("habits", [])
-
 # -----------------------
 # Dashboard Tab
 # -----------------------
-if tab == "Dashboard" or tab == "To-Do List" and st.session_state.get("force_dashboard", False):
+if tab == "Dashboard":
     st.header("Dashboard")
     # Cards row: Tasks progress, Habits weekly completion, Total streaks
     tcol1, tcol2, tcol3 = st.columns(3)
+    today = date.today()
     with tcol1:
         total_tasks = len(tasks)
-        completed_tasks = len([t for t in tasks if t.get("completed")])
+        completed_tasks = store.completed_count
         st.markdown("<div class='card'>", unsafe_allow_html=True)
         st.subheader("Tasks")
         st.write(f"{completed_tasks} / {total_tasks} completed")
@@ -250,7 +462,7 @@ if tab == "Dashboard" or tab == "To-Do List" and st.session_state.get("force_das
         st.markdown("<div class='card'>", unsafe_allow_html=True)
         st.subheader("Habits (weekly)")
         if habits:
-            avg_weekly = int(sum(weekly_completion_for_habit(h) for h in habits) / len(habits))
+            avg_weekly = int(sum(percent(done, 7) for done in dashboard_habit_stats(habits, today)) / len(habits))
         else:
             avg_weekly = 0
         st.write(f"Average weekly completion: {avg_weekly}%")
@@ -260,7 +472,7 @@ if tab == "Dashboard" or tab == "To-Do List" and st.session_state.get("force_das
         st.markdown("<div class='card'>", unsafe_allow_html=True)
         st.subheader("Streaks")
         if habits:
-            best = max(current_streak(h) for h in habits)
+            best = max(current_streak(h, today) for h in habits)
         else:
             best = 0
         st.write(f"Best current streak: {best} day(s)")
@@ -268,19 +480,9 @@ if tab == "Dashboard" or tab == "To-Do List" and st.session_state.get("force_das
 
     st.markdown("---")
     st.subheader("Upcoming tasks (next 7 days)")
-    upcoming = []
-    today = date.today()
-    for t in tasks:
-        if t.get("deadline"):
-            try:
-                d = datetime.fromisoformat(t["deadline"]).date()
-                if 0 <= (d - today).days <= 7:
-                    upcoming.append((d, t))
-            except Exception:
-                pass
-    upcoming = sorted(upcoming, key=lambda x: x[0])
+    upcoming = sorted(iter_upcoming(tasks, today), key=lambda t: t["_deadline_dt"].date())
     if upcoming:
-        for d, t in upcoming:
+        for t in upcoming:
             completed_tag = "✅" if t.get("completed") else "⏳"
             st.write(f"**{t['title']}** — {format_date_iso(t['deadline'])}  {completed_tag}")
             st.write(f"<div class='muted small'>{t.get('description','')}</div>", unsafe_allow_html=True)
@@ -302,33 +504,13 @@ if tab == "To-Do List":
                 if title.strip():
                     add_task(create_task(title, description, deadline))
                     st.success("Task added ✅")
-                    # reload data in-memory
-                    data = load_data()
-                    tasks = data.get("tasks", [])
                 else:
                     st.error("Please provide a title for the task.")
 
-    # Filter tasks by sidebar filter
-    if filter_status == "Completed":
-        displayed_tasks = [t for t in tasks if t.get("completed")]
-    elif filter_status == "Pending":
-        displayed_tasks = [t for t in tasks if not t.get("completed")]
-    else:
-        displayed_tasks = tasks
-
-    # Sorting options
-    sort_by = st.selectbox("Sort by", ["Deadline (soonest)", "Created (newest)", "Title (A-Z)"])
-    if sort_by == "Deadline (soonest)":
-        def key_deadline(t): 
-            try:
-                return datetime.fromisoformat(t["deadline"]) if t.get("deadline") else datetime.max
-            except Exception:
-                return datetime.max
-        displayed_tasks.sort(key=key_deadline)
-    elif sort_by == "Created (newest)":
-        displayed_tasks.sort(key=lambda t: datetime.fromisoformat(t["created_at"]) if t.get("created_at") else datetime.min, reverse=True)
-    else:
-        displayed_tasks.sort(key=lambda t: t.get("title","").lower())
+    # Sort the store's precomputed partition for the sidebar status filter
+    sort_by = st.selectbox("Sort by", list(TASK_SORTS))
+    sort_key, reverse = TASK_SORTS[sort_by]
+    displayed_tasks = sorted(store.by_status[filter_status], key=sort_key, reverse=reverse)
 
     # Display tasks
     st.markdown("### Tasks")
@@ -348,43 +530,33 @@ if tab == "To-Do List":
                     st.write(t.get("description", ""))
                 with c2:
                     # Buttons/controls for each task
-                    if st.button("Edit", key=f"edit_{t['id']}"):
-                        st.session_state["editing_task"] = t["id"]
-                    if st.button("Delete", key=f"del_{t['id']}"):
-                        delete_task(t["id"])
-                        st.experimental_rerun()
-                    if st.checkbox("Completed", value=t.get("completed", False), key=f"chk_{t['id']}"):
-                        if not t.get("completed"):
-                            update_task(t["id"], completed=True)
-                            st.experimental_rerun()
-                    else:
-                        if t.get("completed"):
-                            update_task(t["id"], completed=False)
-                            st.experimental_rerun()
+                    st.button("Edit", key=f"edit_{t['id']}", on_click=_start_editing, args=("editing_task", t["id"]))
+                    st.button("Delete", key=f"del_{t['id']}", on_click=delete_task, args=(t["id"],))
+                    st.checkbox(
+                        "Completed",
+                        value=t.get("completed", False),
+                        key=f"chk_{t['id']}",
+                        on_change=_on_task_toggle,
+                        args=(t["id"], f"chk_{t['id']}"),
+                    )
                 st.markdown("</div>", unsafe_allow_html=True)
 
     # Inline edit panel
+    if "flash_task" in st.session_state:
+        st.success(st.session_state.pop("flash_task"))
     if "editing_task" in st.session_state:
         etid = st.session_state["editing_task"]
-        etask = next((x for x in tasks if x["id"] == etid), None)
+        etask = store.task_by_id.get(etid)
         if etask:
             st.markdown("---")
             st.subheader("Edit Task")
             with st.form("edit_task_form"):
-                new_title = st.text_input("Title", value=etask.get("title", ""))
-                new_deadline = st.date_input("Deadline", value=datetime.fromisoformat(etask["deadline"]).date() if etask.get("deadline") else date.today())
-                new_desc = st.text_area("Description", value=etask.get("description", ""))
-                new_completed = st.checkbox("Completed", value=etask.get("completed", False))
-                save_btn = st.form_submit_button("Save changes")
-                cancel_btn = st.form_submit_button("Cancel")
-                if save_btn:
-                    update_task(etid, title=new_title, description=new_desc, deadline=new_deadline.isoformat(), completed=new_completed)
-                    st.success("Task updated.")
-                    del st.session_state["editing_task"]
-                    st.experimental_rerun()
-                if cancel_btn:
-                    del st.session_state["editing_task"]
-                    st.experimental_rerun()
+                st.text_input("Title", value=etask.get("title", ""), key=f"edit_title_{etid}")
+                st.date_input("Deadline", value=etask["_deadline_dt"].date() if etask["_deadline_dt"] else date.today(), key=f"edit_deadline_{etid}")
+                st.text_area("Description", value=etask.get("description", ""), key=f"edit_desc_{etid}")
+                st.checkbox("Completed", value=etask.get("completed", False), key=f"edit_completed_{etid}")
+                st.form_submit_button("Save changes", on_click=_on_task_edit_save, args=(etid,))
+                st.form_submit_button("Cancel", on_click=_stop_editing, args=("editing_task",))
 
 # -----------------------
 # Habit Tracker Tab
@@ -402,8 +574,6 @@ if tab == "Habit Tracker":
                 if name.strip():
                     add_habit(create_habit(name, desc))
                     st.success("Habit added ✅")
-                    data = load_data()
-                    habits = data.get("habits", [])
                 else:
                     st.error("Habit must have a name.")
 
@@ -414,70 +584,65 @@ if tab == "Habit Tracker":
     week_dates = get_week_dates(ref_date)
 
     st.markdown(f"**Week:** {week_dates[0].strftime('%b %d')} — {week_dates[-1].strftime('%b %d')}")
-    # Table header
-    header_cols = st.columns([3] + [1]*7)
-    header_cols[0].markdown("**Habit**")
-    for i, d in enumerate(week_dates):
-        header_cols[i+1].markdown(f"**{WEEKDAYS[d.weekday()]}<br><div class='muted small'>{d.day}</div>**", unsafe_allow_html=True)
 
     # Habit rows
     if not habits:
         st.info("No habits yet. Add one to start tracking daily progress.")
     else:
-        for h in habits:
-            row_cols = st.columns([3] + [1]*7)
-            name_col = row_cols[0]
-            name_col.markdown(f"**{h['name']}**")
-            name_col.markdown(f"<div class='muted small'>{h.get('description','')}</div>", unsafe_allow_html=True)
-            # Render checkboxes for each day in the selected week
-            for i, d in enumerate(week_dates):
-                iso = d.isoformat()
-                done = iso in h.get("log", [])
-                # Allow marking only for current week and current day (optional: make all days toggleable)
-                # We'll allow toggling for any visible day but prefer to guide marking for current day.
-                if row_cols[i+1].checkbox("", value=done, key=f"{h['id']}_{iso}"):
-                    if not done:
-                        toggle_habit_for_date(h["id"], iso, True)
-                        st.experimental_rerun()
-                else:
-                    if done:
-                        toggle_habit_for_date(h["id"], iso, False)
-                        st.experimental_rerun()
-
+        # One editable grid for the whole week: rows are habits, columns are days
+        # Column headers ("Mon 13") built once and reused as the grid's labels
+        headers = [f"{WEEKDAYS[d.weekday()]} {d.day}" for d in week_dates]
+        grid = pd.DataFrame(
+            {col: [d.toordinal() in h["_log_ord"] for h in habits] for col, d in zip(headers, week_dates)},
+            index=[h["name"] for h in habits],
+        )
+        # Key on week + habit ids so pending grid edits never shift onto other rows
+        grid_key = f"habit_grid_{week_dates[0].isoformat()}_{hash(tuple(h['id'] for h in habits))}"
+        # Toggles stay client-side until "Save week" submits the whole grid at once
+        with st.form("habit_week_grid"):
+            st.data_editor(
+                grid,
+                key=grid_key,
+                use_container_width=True,
+                column_config={col: st.column_config.CheckboxColumn() for col in headers},
+            )
+            st.form_submit_button(
+                "Save week",
+                on_click=_on_habit_grid_submit,
+                args=(grid_key, [h["id"] for h in habits], dict(zip(headers, week_dates))),
+            )
+
+        # One week set and one today snapshot shared by every habit row
+        week_counts = dashboard_habit_stats(habits, ref_date)
+        today = date.today()
+        for h, done in zip(habits, week_counts):
+            st.markdown(f"**{h['name']}**")
+            st.markdown(f"<div class='muted small'>{h.get('description','')}</div>", unsafe_allow_html=True)
             # Small controls for habit: edit / delete / streak / weekly %
             control_cols = st.columns([1,1,1,4])
             with control_cols[0]:
-                if st.button("Edit", key=f"edit_h_{h['id']}"):
-                    st.session_state["editing_habit"] = h["id"]
+                st.button("Edit", key=f"edit_h_{h['id']}", on_click=_start_editing, args=("editing_habit", h["id"]))
             with control_cols[1]:
-                if st.button("Delete", key=f"del_h_{h['id']}"):
-                    delete_habit(h["id"])
-                    st.experimental_rerun()
+                st.button("Delete", key=f"del_h_{h['id']}", on_click=delete_habit, args=(h["id"],))
             with control_cols[2]:
-                st.markdown(f"**Streak:** {current_streak(h)}d")
+                st.markdown(f"**Streak:** {current_streak(h, today)}d")
             with control_cols[3]:
-                st.markdown(f"**Week:** {weekly_completion_for_habit(h, ref_date)}%")
+                st.markdown(f"**Week:** {percent(done, 7)}%")
 
     # Edit habit panel
+    if "flash_habit" in st.session_state:
+        st.success(st.session_state.pop("flash_habit"))
     if "editing_habit" in st.session_state:
         hid = st.session_state["editing_habit"]
-        habit = next((x for x in habits if x["id"] == hid), None)
+        habit = store.habit_by_id.get(hid)
         if habit:
             st.markdown("---")
             st.subheader("Edit Habit")
             with st.form("edit_habit_form"):
-                n = st.text_input("Name", value=habit.get("name", ""))
-                d = st.text_area("Description", value=habit.get("description", ""))
-                save = st.form_submit_button("Save")
-                cancel = st.form_submit_button("Cancel")
-                if save:
-                    update_habit(hid, name=n, description=d)
-                    st.success("Habit updated.")
-                    del st.session_state["editing_habit"]
-                    st.experimental_rerun()
-                if cancel:
-                    del st.session_state["editing_habit"]
-                    st.experimental_rerun()
+                st.text_input("Name", value=habit.get("name", ""), key=f"edit_name_{hid}")
+                st.text_area("Description", value=habit.get("description", ""), key=f"edit_hdesc_{hid}")
+                st.form_submit_button("Save", on_click=_on_habit_edit_save, args=(hid,))
+                st.form_submit_button("Cancel", on_click=_stop_editing, args=("editing_habit",))
 
 # -----------------------
 # Settings Tab
@@ -487,15 +652,19 @@ if tab == "Settings":
     st.write("Manage app storage and preferences.")
     st.write(f"Data file: `{os.path.abspath(DATA_FILE)}`")
     if st.button("Backup data to backup_data.json"):
-        data = load_data()
-        with open("backup_data.json", "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        # Byte copy of the file on disk; flush first so it includes pending changes
+        store.flush()
+        shutil.copyfile(DATA_FILE, "backup_data.json.tmp")
+        os.replace("backup_data.json.tmp", "backup_data.json")
         st.success("Backup saved as backup_data.json")
     if st.button("Reset all data (DELETE!)"):
         if st.confirm("Are you sure? This will delete all tasks & habits permanently."):
-            save_data({"tasks": [], "habits": []})
+            with store.mutate():
+                store.set({"tasks": [], "habits": []})
             st.success("Data reset.")
-            st.experimental_rerun()
+
+# Write any changes made during this run
+store.flush()
 
 # -----------------------
 # Footer / small tips